@@ -1,9 +1,31 @@
 import sys
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import re
-
-from openai import OpenAI
+import functools
+import heapq
+import hashlib
+import sqlite3
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI, NOT_GIVEN
+
+# Optional: streams PubMed JSON rather than loading whole documents.
+try:
+    import ijson
+    # Raised by ijson when the streamed JSON is malformed or truncated.
+    ijson_errors = (ijson.JSONError,)
+except ImportError:
+    ijson = None
+    ijson_errors = ()
+
+# Optional: faster JSON decoding than the standard library.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Constants required for API usage -  PubMed, PlasmoDB, OpenAI.
 
@@ -15,6 +37,15 @@ pubmed_base_url = "https://www.ncbi.nlm.nih.gov/research/bionlp/RESTful/pmcoa.cg
 get_alias_url = "https://plasmodb.org/plasmo/service/record-types/gene/records"
 get_alias_project = "PlasmoDB"
 
+# Splits letters+digits gene IDs (e.g. EBA181) so an optional hyphen can be matched between the parts.
+alpha_num_split = re.compile(r'([a-zA-Z]+)([0-9]+)')
+
+# Aliases shorter than this are ignored when searching papers, as they give too many false matches.
+min_alias_length = 3
+
+# Aliases already fetched from PlasmoDB, keyed by gene ID, so repeated lookups for the same gene are not re-requested.
+alias_cache = {}
+
 #  The sections of PubMed documents that are relevant for gene curation.
 pubmed_sections = ['FIG', 'TABLE', 'RESULTS', 'CONCL', 'DISCUSSION', 'SUPPL'] # removed title, abstract, intro and added supplementary
 
@@ -22,23 +53,47 @@ open_ai_model = "gpt-4o"
 max_tokens = 16384
 model_temp = 0
 
+# SQLite file used to cache summaries between runs, keyed on the gene, paper, model settings and prompts.
+# Set to None to disable caching.
+summary_cache_path = "summary_cache.sqlite"
+
+# Shared HTTP session so connections to PubMed and PlasmoDB are kept alive and reused between requests.
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
+# Shared OpenAI client, created on first use by get_openai_client.
+openai_client = None
+
+# Maximum number of papers processed at once by process_papers.
+max_concurrent_papers = 8
 
-# The prompts to use in the workflow, using [gene] as a placeholder for the gene ID and synonyms:
+
+# The prompts to use in the workflow, using {gene} as a placeholder for the gene ID and synonyms:
 #  1) "extract": Extract all information related to the gene from the text, used for later stages
 #  2) "summary": Summarise the information in a structured way (may be too long for display)
 #  3) "short_summary": Provide a short summary for display,
 #  4) "title": Provide a title for display.
+# Pairs of these are sent in a single call (extract + title, summary + short_summary) using combined_prompt, returning JSON.
+# Placeholders are filled with str.format_map, so any literal braces in a prompt (e.g. a JSON example) must be doubled: {{ and }}.
 
 # NB: prompts subject to change depending on final testing
 defaultSystem = "You are a systematic gene curation assistant for scientific publications.  Your output will be used verbatim. Do not include any commentary, explanations, apologies, or disclaimers. Only return the final result as plain text."
 
-global_prompts = {"extract": "From the text given, extract and quote all of the information which is related to [gene]. Quote all specific results, data, inferences or conclusions that are relevant to this specific gene.  But do not infer activity based on other genes, focus only on this specific gene product. ",
+# System prompt for the combined calls, which must reply with JSON rather than plain text.
+jsonSystem = "You are a systematic gene curation assistant for scientific publications.  Your output will be used verbatim. Do not include any commentary, explanations, apologies, or disclaimers. Only return the final result as a JSON object."
+
+# Asks for two prompts to be answered in one call, using {first} and {second} as placeholders for the prompt keys
+# and {first_prompt} and {second_prompt} for the prompt texts.
+# Filled with str.format_map: write any literal braces (e.g. an example JSON object) as {{ and }}.
+combined_prompt = "Complete the following two tasks and respond with a JSON object with exactly two string fields: \"{first}\" containing the plain text result of task 1, and \"{second}\" containing the plain text result of task 2. \n Task 1: {first_prompt} \n Task 2 (based on your result for task 1): {second_prompt}"
+
+global_prompts = {"extract": "From the text given, extract and quote all of the information which is related to {gene}. Quote all specific results, data, inferences or conclusions that are relevant to this specific gene.  But do not infer activity based on other genes, focus only on this specific gene product. ",
 
-"summary" :"ROLE: You are a scientist preparing a literature review making a study of the of the gene known as [gene] GOAL: Your purpose is to systematically review the text and summarise. Think step-by-step using the following workflow: \n 1) Include any experiments conducted and their results, as well as all conclusions to do with the activity, location, domain or expression of this gene.\n 2) Include anything else that may be relevant to a scientist studying this gene. \n 3) Provide the key findings from your review in bullet point format. \n 4) Consider if each bullet point is based on direct evidence from a statement made in the text, or based on inferences you made from the text.\n 5) This gene is present in the text.  If it is only mentioned in passing, or without any conclusion, then include the context of where it is mentioned and supply direct quotes. \n 6) Classify each bullet point as ‘Direct’ or ‘Inferred’ in your response. \n Respond objectively.  Add no other commmentary. Do not refer to the gene by name or id as this is already included in the user output.",
+"summary" :"ROLE: You are a scientist preparing a literature review making a study of the of the gene known as {gene} GOAL: Your purpose is to systematically review the text and summarise. Think step-by-step using the following workflow: \n 1) Include any experiments conducted and their results, as well as all conclusions to do with the activity, location, domain or expression of this gene.\n 2) Include anything else that may be relevant to a scientist studying this gene. \n 3) Provide the key findings from your review in bullet point format. \n 4) Consider if each bullet point is based on direct evidence from a statement made in the text, or based on inferences you made from the text.\n 5) This gene is present in the text.  If it is only mentioned in passing, or without any conclusion, then include the context of where it is mentioned and supply direct quotes. \n 6) Classify each bullet point as ‘Direct’ or ‘Inferred’ in your response. \n Respond objectively.  Add no other commmentary. Do not refer to the gene by name or id as this is already included in the user output.",
 
-"short_summary": " Give a one-sentence overview summary for [gene] in the previous text. If the evidence is limited or uncertain do not give a misleading summary by making statements that do not have clear support; you must include any and all limitations of the evidence such as putative or hypothetical etc.   Add no other commmentary.  Do not refer to the gene by name or id as this is already included in the user output. ",
+"short_summary": " Give a one-sentence overview summary for {gene} in the previous text. If the evidence is limited or uncertain do not give a misleading summary by making statements that do not have clear support; you must include any and all limitations of the evidence such as putative or hypothetical etc.   Add no other commmentary.  Do not refer to the gene by name or id as this is already included in the user output. ",
 
-"title": " Give a short title describing the role of [gene] in the previous text. If the evidence is limited do not give a misleading title by making statements that do not have clear support; you must include any  limitations of the evidence such as putative or hypothetical etc. Add no other commmentary.  Do not refer to the gene by name or id as this is already included in the user output." }
+"title": " Give a short title describing the role of {gene} in the previous text. If the evidence is limited do not give a misleading title by making statements that do not have clear support; you must include any  limitations of the evidence such as putative or hypothetical etc. Add no other commmentary.  Do not refer to the gene by name or id as this is already included in the user output." }
 
 
 def gene_to_prompt(gene,genes):
@@ -59,15 +114,44 @@ def gene_to_prompt(gene,genes):
         return gene + " ( also known as "+ " or ".join(genes) +" )"
 
 
-def call_prompt(strings, system=defaultSystem):
+def get_openai_client():
+    """
+    Returns the shared OpenAI client, creating it on first use so its connections are reused between calls.
+
+    Returns:
+        OpenAI: The OpenAI client (the API key defaults to the OPENAI_API_KEY environment variable).
+    """
+
+    global openai_client
+    if openai_client is None:
+        openai_client = OpenAI()
+    return openai_client
+
+
+class TruncatedResponseError(ValueError):
+    """
+    Raised by call_prompt when a JSON response is cut off by the max_tokens limit.
+    """
+
+
+def call_prompt(strings, system=defaultSystem, cache_key=None, json_output=False):
     """
     Calls the OpenAI API with a list of strings and a system prompt.
     Args:
         strings (list of str): A list of strings to be sent to the API. Each will be treated as a separate user message.
         system (str): The system prompt to be used.
+        cache_key (str): Optional key to group requests sharing the same prefix, improving OpenAI prompt cache hits.
+        json_output (bool): Whether to request a JSON object response (the prompts must mention JSON).
 
     Returns:
         str: The response from the OpenAI API.
+
+    Raises:
+        TruncatedResponseError: If a JSON response was cut off by the max_tokens limit (it would not be valid JSON).
+
+    Notes:
+        OpenAI caches long, identical message prefixes automatically, so the system prompt and large texts
+        should come first and the (short) instruction prompt last.
     """
 
     messages = []
@@ -77,51 +161,199 @@ def call_prompt(strings, system=defaultSystem):
     for string in strings:
         messages.append({"role": "user", "content": string})
 
-    # Defaults to get key from environment variable
+    client = get_openai_client()
 
-    client = OpenAI()
+    extra_body = {"prompt_cache_key": cache_key} if cache_key else None
+    response_format = {"type": "json_object"} if json_output else NOT_GIVEN
 
     response = client.chat.completions.create(
         model=open_ai_model,
         messages=messages,
         max_tokens=max_tokens,
         temperature=model_temp,
-
+        extra_body=extra_body,
+        response_format=response_format,
     )
 
-    return response.choices[0].message.content
+    choice = response.choices[0]
 
-def count_substrings(paper, gene_string):
+    # Truncated plain text is still usable, but truncated JSON cannot be parsed.
+    if json_output and choice.finish_reason == "length":
+        raise TruncatedResponseError(f"OpenAI response exceeded the token limit ({max_tokens} tokens)")
+
+    return choice.message.content
+
+def _alias_core(gene_string):
     """
-    Counts how many times a gene ID appears in a given text,
-    ensuring it's not embedded within alphanumeric characters. Regular expressions courtesy of ChatGPT.
+    Builds the core regex for a gene ID, without the delimiting lookarounds.
 
     Args:
-        paper (str): The input text to search within.
         gene_string (str): The gene ID to search for.
 
     Returns:
-        int: The count of non-embedded occurrences of the gene ID.
-
-    Raises:
-        ValueError: If the gene_string is empty.
+        str: The escaped regex, allowing an optional hyphen for letters+digits IDs.
     """
 
     # Check if it's a letters+digits pattern (e.g., EBA181).
-    match = re.fullmatch(r'([a-zA-Z]+)([0-9]+)', gene_string)
+    match = alpha_num_split.fullmatch(gene_string)
 
     if match:
         # Support an optional hyphen between letters and numbers.
         part1, part2 = map(re.escape, match.groups())
-        core = f"{part1}-?{part2}"
-    else:
-        core = re.escape(gene_string)
+        return f"{part1}-?{part2}"
+
+    return re.escape(gene_string)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compiled_alias_pattern(alias_lower):
+    """
+    Builds and compiles the regex matching a single (lower-cased) alias at a given position, used by count_aliases.
+    Cached, as the same aliases are searched for across papers.
+
+    Args:
+        alias_lower (str): The lower-cased gene ID to search for.
+
+    Returns:
+        re.Pattern: The compiled pattern, matching lower-cased text.
+    """
+
+    return re.compile(rf'{_alias_core(alias_lower)}(?![a-zA-Z0-9])')
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled_alternation(aliases):
+    """
+    Builds and compiles the regexes used by count_aliases.
+    Cached on the aliases found in a paper, so the combined pattern is only reused when a later paper contains
+    the same set of aliases; the single-alias patterns are cached separately by _compiled_alias_pattern.
+
+    Args:
+        aliases (tuple of str): The gene IDs to search for.
+
+    Returns:
+        tuple: A pattern finding every position where any of the aliases starts, and a pattern
+        per alias (in the given order) to match it at such a position. All match lower-cased text.
+    """
+
+    # Matching is against the lower-cased paper, so the patterns are lower-cased rather than using re.IGNORECASE.
+    cores = [_alias_core(alias.lower()) for alias in aliases]
 
     # Pattern: substring not embedded in alphanumerics (whitespace is OK)
+    # Explicit lookarounds rather than \b: \b treats "_" and non-ASCII letters as part of a word, and next to an alias
+    # which starts or ends with punctuation it only matches when a word character is adjacent (the opposite of this rule).
+    # The lookahead makes this zero-width, so overlapping aliases (e.g. "AMA1" and "AMA1 protein") are all found.
+    alternation = "|".join(cores)
+    starts = re.compile(rf'(?<![a-zA-Z0-9])(?=(?:{alternation})(?![a-zA-Z0-9]))')
+    patterns = [_compiled_alias_pattern(alias.lower()) for alias in aliases]
+    return starts, patterns
+
+
+def alias_in_text(alias, text_lower):
+    """
+    Quickly checks whether an alias could occur in a text, ignoring case and delimiters, without using regular expressions.
+
+    Args:
+        alias (str): The gene ID to search for.
+        text_lower (str): The lower-cased text to search within.
+
+    Returns:
+        bool: False if the alias cannot be in the text; True if it may be (the regex decides).
+    """
+
+    match = alpha_num_split.fullmatch(alias)
+
+    if match:
+        # Letters+digits IDs may also appear with a hyphen (e.g. EBA181 or EBA-181).
+        letters, digits = match.groups()
+        letters = letters.lower()
+        return f"{letters}{digits}" in text_lower or f"{letters}-{digits}" in text_lower
+
+    return alias.lower() in text_lower
+
+
+def count_aliases(paper, aliases, paper_lower=None):
+    """
+    Counts how many times each alias appears in a given text,
+    ensuring it's not embedded within alphanumeric characters. Regular expressions courtesy of ChatGPT.
+
+    Args:
+        paper (str): The input text to search within.
+        aliases (list of str): The gene IDs to search for.
+        paper_lower (str): Optionally, the text already lower-cased (computed if not given).
+
+    Returns:
+        dict: The number of non-embedded occurrences of each alias, only including those found.
 
-    pattern = rf'(?<![a-zA-Z0-9]){core}(?![a-zA-Z0-9])'
-    matches = re.findall(pattern, paper, re.IGNORECASE)
-    return len(matches)
+    Notes:
+        The text is scanned once for positions where any alias starts, rather than once per alias.
+        Each alias is still counted independently, so overlapping aliases (e.g. "AMA1" and "AMA1 protein")
+        both count a shared occurrence.
+        Aliases which do not appear in the text at all (usually most of them) are skipped with a plain substring test.
+    """
+
+    if paper_lower is None:
+        paper_lower = paper.lower()
+
+    aliases = tuple(alias for alias in aliases if alias_in_text(alias, paper_lower))
+
+    if not aliases:
+        return {}
+
+    starts, patterns = _compiled_alternation(aliases)
+
+    counts = [0] * len(aliases)
+    # End of the last match of each alias, so an alias's own matches do not overlap (as with finditer).
+    ends = [0] * len(aliases)
+    for start in starts.finditer(paper_lower):
+        position = start.start()
+        for i, pattern in enumerate(patterns):
+            if position >= ends[i]:
+                match = pattern.match(paper_lower, position)
+                if match:
+                    counts[i] += 1
+                    ends[i] = match.end()
+
+    return {alias: count for alias, count in zip(aliases, counts) if count > 0}
+
+
+def count_substrings(paper, gene_string):
+    """
+    Counts how many times a gene ID appears in a given text,
+    ensuring it's not embedded within alphanumeric characters.
+
+    Args:
+        paper (str): The input text to search within.
+        gene_string (str): The gene ID to search for.
+
+    Returns:
+        int: The count of non-embedded occurrences of the gene ID.
+
+    Notes:
+        Kept for backward compatibility only; nothing in this module calls it. It lower-cases the whole text on
+        every call, so use count_aliases to count several gene IDs in the same text.
+    """
+
+    return count_aliases(paper, [gene_string]).get(gene_string, 0)
+
+
+def load_json(data):
+    """
+    Decodes JSON, using orjson if it is installed (faster for large PubMed documents) or the json module otherwise.
+
+    Args:
+        data (str or bytes): The JSON text.
+
+    Returns:
+        The decoded JSON value.
+
+    Raises:
+        ValueError: If the data is not valid JSON.
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def get_vpdb_alias(gene_id):
@@ -135,8 +367,13 @@ def get_vpdb_alias(gene_id):
         list: The possible aliases for this gene
         If no aliases are found, returns empty list
 
+    Notes:
+        Successful lookups are cached in the global `alias_cache`; failed requests are not cached so they can be retried.
     """
 
+    if gene_id in alias_cache:
+        return list(alias_cache[gene_id])
+
     url = get_alias_url
     project = get_alias_project
 
@@ -154,23 +391,18 @@ def get_vpdb_alias(gene_id):
     }
 
     # Make the POST request to the (PlasmoDB) API.
-    response = requests.post(url, headers=headers, json=data)
+    response = http_session.post(url, headers=headers, json=data)
 
     if response.status_code != 200:
         return []
 
-    alias_set = set()
-
-    # Parse the response to extract aliases from the Alias table.
-    if "tables" in response.json():
-        table = response.json()["tables"]
+    # Parse the response (once) to extract aliases from the Alias table.
+    table = load_json(response.content).get("tables")
+    aliases = table.get("Alias", []) if table else []
 
-        aliases = table.get("Alias", [])
-        for row in aliases:
-            alias_set.add(row["alias"])
-
-    alias_list = list(alias_set)
-    return alias_list
+    alias_list = list({row["alias"] for row in aliases})
+    alias_cache[gene_id] = alias_list
+    return list(alias_list)
 
 def clean_text_output(text):
     """
@@ -197,56 +429,97 @@ def parse_pubmed_json(pubmed_json):
     Parses a PubMed JSON response to extract and concatenate text from relevant sections.
 
     Args:
-        pubmed_json (list of dict): The JSON response from the PubMed API,
-                                    typically a list of (usually 1) documents.
+        pubmed_json (iterable of dict): The passages of the JSON response from the PubMed API, as returned by
+                                        get_pubmed_json (no longer the full list of documents).
 
     Returns:
         str: A single string containing the concatenated text from required sections, preserving the original ordering.
 
+    Raises:
+        ValueError: If the passages are being streamed and the JSON turns out to be malformed.
+
     Notes:
         Uses the global variable `pubmed_sections` to determine which sections to include.
     """
 
-    document_text = ""
+    allowed_sections = {s.upper() for s in pubmed_sections}
+    texts = []
 
-    for doc in pubmed_json:
-        for document in doc.get("documents", []):
-            for passage in document.get("passages", []):
-                infons = passage.get("infons", {})
-                section_type = infons.get("section_type", "")
-                if section_type.upper() in {s.upper() for s in pubmed_sections}:
-                    if "text" in passage:
-                        document_text += passage["text"] + "\n"
-
-    return document_text
+    try:
+        for passage in pubmed_json:
+            infons = passage.get("infons", {})
+            section_type = infons.get("section_type", "")
+            if section_type.upper() in allowed_sections:
+                if "text" in passage:
+                    texts.append(passage["text"])
+    except ijson_errors as e:
+        raise ValueError(f"Paper JSON could not be parsed: {e}") from e
+
+    # Each passage is followed by a newline.
+    return "\n".join(texts) + ("\n" if texts else "")
 
 def get_pubmed_json(pubmed_id):
     """
-    Fetches the PubMed JSON for a given PubMed ID.
+    Fetches the PubMed JSON for a given PubMed ID and returns its passages.
     Args:
         pubmed_id (str): The PubMed ID to fetch.
     Raises:
         ValueError: If the PubMed ID is not found or if the response is not in JSON format.
     Returns:
-        dict: The JSON response from the PubMed API.
+        iterable of dict: The passages of all documents in the JSON response from the PubMed API, in order
+                          (rather than the full JSON response, so they can be streamed).
     Notes:
         The PubMed ID should be a valid identifier, and the function constructs the URL
         to fetch the JSON data using the global pubmed_base_url
+        If ijson is installed the response is parsed as it is streamed, one passage at a time,
+        rather than loading the whole (possibly multi-MB) document first.
     """
 
     url = pubmed_base_url + str(pubmed_id)
-    response = requests.get(url)
+    response = http_session.get(url, stream=True)
 
     if response.status_code == 200:
         # Checks if there is a json response - the API returns html if the paper is not found.
         if not response.headers.get('Content-Type', '').startswith('application/json'):
+            response.close()
             raise ValueError("Paper not found")
 
-        return response.json()
+        if ijson is not None:
+            return stream_pubmed_passages(response)
+
+        with response:
+            pubmed_json = load_json(response.content)
 
+        # The response is a list of (usually 1) collections of documents.
+        return (passage
+                for doc in pubmed_json
+                for document in doc.get("documents", [])
+                for passage in document.get("passages", []))
+
+    response.close()
     raise ValueError(f"Paper fetch status code: {response.status_code}")
 
 
+def stream_pubmed_passages(response):
+    """
+    Parses the passages from a streamed PubMed JSON response with ijson, one at a time.
+
+    Args:
+        response (requests.Response): The PubMed API response, requested with stream=True.
+
+    Returns:
+        generator of dict: The passages of all documents in the response, in order.
+
+    Notes:
+        The response is closed once the passages are exhausted, or if parsing stops early.
+    """
+
+    with response:
+        # Let urllib3 undo any gzip encoding before ijson reads the stream.
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, "item.documents.item.passages.item")
+
+
 def get_gene_synonyms(gene_id, paper):
     """
     Retrieves synonyms for a given gene ID from the (e.g. PlasmoDB) database and counts their occurrences in a given paper text to get those that are used.
@@ -261,7 +534,7 @@ def get_gene_synonyms(gene_id, paper):
         list: A list of the three most common aliases found in the paper
 
     Notes:
-        This function uses the count_substrings function which does additional regex parsing to add hyphens and ignore substrings if not delimited
+        This function uses the count_aliases function which does additional regex parsing to add hyphens and ignore substrings if not delimited
 
     """
     aliases = get_vpdb_alias(gene_id)
@@ -269,21 +542,25 @@ def get_gene_synonyms(gene_id, paper):
     # Remove the gene id from the aliases; it is used separately.
     aliases = [item for item in aliases if item != gene_id]
 
+    # Drop very short aliases and case-insensitive duplicates (matching ignores case anyway).
+    # Sorted, as the aliases come from a set: this keeps the same case variant (and tie order) on every run.
+    unique_aliases = {}
+    for alias in sorted(aliases):
+        if len(alias) >= min_alias_length:
+            unique_aliases.setdefault(alias.lower(), alias)
+    aliases = list(unique_aliases.values())
+
     # Count how often each alias appears in the paper.
-    alias_count = {}
-    for alias in aliases:
-        count = count_substrings(paper, alias)
-        if count > 0:
-            alias_count[alias] = count
+    paper_lower = paper.lower()
+    alias_count = count_aliases(paper, aliases, paper_lower)
 
     # Return just the 3 most common.
-    sorted_aliases = sorted(alias_count, key=alias_count.get, reverse=True)
-    return sorted_aliases[:3]
+    return heapq.nlargest(3, alias_count, key=alias_count.get)
 
 
 def get_prompt_and_replace(key, replacements):
     """
-    Retrieves a specific prompt text from the global_prompts dictionary and replaces [] placeholders with provided values (currently only [gene]).
+    Retrieves a specific prompt text from the global_prompts dictionary and replaces {} placeholders with provided values (currently only {gene}).
 
     Args:
         key (str): The key for the prompt in the global_prompts dictionary.
@@ -294,11 +571,124 @@ def get_prompt_and_replace(key, replacements):
     :
     """
     
-    full_text = global_prompts[key]
-    for key, value in replacements.items():
-        full_text = full_text.replace(f"[{key}]", value)
-    return full_text
+    # format_map fills all placeholders in a single pass over the prompt.
+    return global_prompts[key].format_map(replacements)
+
+
+def call_combined_prompt(text, first, second, replacements, cache_key=None):
+    """
+    Answers two prompts from the global_prompts dictionary about a text with a single OpenAI call.
+
+    Args:
+        text (str): The text the prompts refer to (sent before the prompts).
+        first (str): The key of the first prompt.
+        second (str): The key of the second prompt, which may build on the result of the first.
+        replacements (dict): Placeholder replacements for the prompts, as for get_prompt_and_replace.
+        cache_key (str): Optional prompt cache key, as for call_prompt.
+
+    Returns:
+        tuple: The results of the first and second prompts.
+
+    Raises:
+        ValueError: If the response is not a JSON object with both results.
+
+    Notes:
+        Both results share one max_tokens budget (and the JSON escaping). If that is not enough, e.g. for a long
+        extract, the prompts are sent as two separate plain-text calls instead, as the second builds on the first.
+    """
+
+    first_prompt = get_prompt_and_replace(first, replacements)
+    second_prompt = get_prompt_and_replace(second, replacements)
+    prompt = combined_prompt.format_map({"first": first, "second": second,
+                                         "first_prompt": first_prompt, "second_prompt": second_prompt})
+
+    try:
+        response = call_prompt([text, prompt], system=jsonSystem, cache_key=cache_key, json_output=True)
+    except TruncatedResponseError:
+        first_result = call_prompt([text, first_prompt], cache_key=cache_key)
+        second_result = call_prompt([first_result, second_prompt])
+        return first_result, second_result
+
+    try:
+        results = load_json(response)
+        first_result, second_result = results[first], results[second]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Unexpected response from OpenAI")
+
+    # Both results must be plain text (not e.g. a list of bullet points).
+    if not isinstance(first_result, str) or not isinstance(second_result, str):
+        raise ValueError("Unexpected response from OpenAI")
 
+    return first_result, second_result
+
+
+def summary_cache_key(gene_id, pubmed_id):
+    """
+    Builds the key used to cache a summary.
+
+    Args:
+        gene_id (str): The ID of the gene.
+        pubmed_id (str): The PubMed ID of the paper.
+
+    Returns:
+        str: A SHA-256 hex digest of the IDs, the model settings and the prompts.
+
+    Notes:
+        The prompts are part of the key, so editing `global_prompts`, `combined_prompt` or the system prompts invalidates existing entries.
+    """
+
+    prompts = json.dumps([defaultSystem, jsonSystem, combined_prompt, global_prompts], sort_keys=True)
+    key_text = f"{gene_id}|{pubmed_id}|{open_ai_model}|{model_temp}|{max_tokens}|{prompts}"
+    return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+
+def get_cached_summary(gene_id, pubmed_id):
+    """
+    Looks up a previously generated summary in the cache (see `summary_cache_path`).
+
+    Args:
+        gene_id (str): The ID of the gene.
+        pubmed_id (str): The PubMed ID of the paper.
+
+    Returns:
+        dict: The cached result of get_summary, or None if not cached (or caching is disabled or unavailable).
+    """
+
+    if not summary_cache_path:
+        return None
+
+    # The cache is best-effort: if it cannot be read (e.g. locked or not writable) or the entry is corrupt,
+    # treat it as a miss; the entry is then replaced by cache_summary.
+    try:
+        with contextlib.closing(sqlite3.connect(summary_cache_path)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, result TEXT)")
+            row = connection.execute("SELECT result FROM summaries WHERE key = ?", (summary_cache_key(gene_id, pubmed_id),)).fetchone()
+        return load_json(row[0]) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def cache_summary(gene_id, pubmed_id, result):
+    """
+    Stores a generated summary in the cache (see `summary_cache_path`).
+
+    Args:
+        gene_id (str): The ID of the gene.
+        pubmed_id (str): The PubMed ID of the paper.
+        result (dict): The result of get_summary.
+    """
+
+    if not summary_cache_path:
+        return
+
+    # The cache is best-effort: if it cannot be written (e.g. locked or not writable), the result is still returned.
+    try:
+        with contextlib.closing(sqlite3.connect(summary_cache_path)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, result TEXT)")
+            connection.execute("INSERT OR REPLACE INTO summaries (key, result) VALUES (?, ?)",
+                               (summary_cache_key(gene_id, pubmed_id), json.dumps(result, ensure_ascii=False)))
+    except sqlite3.Error:
+        pass
 
 
 def get_summary(gene_id, pubmed_id):
@@ -313,7 +703,7 @@ def get_summary(gene_id, pubmed_id):
 
     """
 
-    # Get the PubMed JSON for the given ID.
+    # Get the PubMed JSON (passages) for the given ID.
     pubmed_json = get_pubmed_json(pubmed_id)
     # Parse the PubMed JSON to get the text of the required sections.
     pubmed_text = parse_pubmed_json(pubmed_json)
@@ -324,21 +714,16 @@ def get_summary(gene_id, pubmed_id):
     gene_text = gene_to_prompt(gene_id, synonyms)
     replacements = {"gene" : gene_text}
 
-    # Extract the relevant information from the PubMed text.
-    extract_prompt = get_prompt_and_replace("extract", replacements)
-    extract = call_prompt([pubmed_text,extract_prompt])
-
-    # Summarise the gene information for this paper.
-    summary_prompt = get_prompt_and_replace("summary", replacements)
-    summary = clean_text_output(call_prompt([extract,summary_prompt]))
+    # Extract the relevant information from the PubMed text, and create a title for the gene, in one call.
+    # The system prompt and paper text form the only long shared prefix, the same for any gene in this paper,
+    # so the paper alone is used to group these calls for prompt caching.
+    extract, title = call_combined_prompt(pubmed_text, "extract", "title", replacements, cache_key=str(pubmed_id))
+    title = clean_text_output(title)
 
-
-    # Create a short summary and title for the gene.
-    short_summary_prompt = get_prompt_and_replace("short_summary", replacements)
-    short_summary = clean_text_output(call_prompt([summary,short_summary_prompt]))
-
-    title_prompt = get_prompt_and_replace("title", replacements)
-    title = clean_text_output(call_prompt([extract, title_prompt]))
+    # Summarise the gene information for this paper, and create a short summary, in one call.
+    summary, short_summary = call_combined_prompt(extract, "summary", "short_summary", replacements)
+    summary = clean_text_output(summary)
+    short_summary = clean_text_output(short_summary)
 
     # Return everything that might be used.
 
@@ -360,13 +745,45 @@ def process_paper(gene_id, pubmed_id):
     """
 
     try:
-        result = get_summary(gene_id, pubmed_id)
+        # Re-use the stored result if this paper has already been summarised for the gene.
+        result = get_cached_summary(gene_id, pubmed_id)
+        if result is None:
+            result = get_summary(gene_id, pubmed_id)
+            cache_summary(gene_id, pubmed_id, result)
     except ValueError as e:
         result = {"code": 1, "message": str(e), "gene_id": gene_id, "pubmed_id": pubmed_id}
 
     return result
 
 
+def process_papers(pairs):
+    """
+    Processes several PubMed papers concurrently, each for a given gene ID.
+
+    Args:
+        pairs (list of tuple): (gene_id, pubmed_id) pairs to process.
+
+    Returns:
+        list: The result of process_paper for each pair, in the same order as given.
+
+    Notes:
+        The work is I/O bound (PubMed, PlasmoDB and OpenAI requests), so up to `max_concurrent_papers`
+        papers are processed at once in threads.
+        Any failure for a pair (e.g. a connection or OpenAI error) is returned as an error (code 1) for
+        that pair, so the rest of the batch is not lost.
+    """
+
+    def process_pair(pair):
+        gene_id, pubmed_id = pair
+        try:
+            return process_paper(gene_id, pubmed_id)
+        except Exception as e:
+            return {"code": 1, "message": str(e), "gene_id": gene_id, "pubmed_id": pubmed_id}
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_papers) as executor:
+        return list(executor.map(process_pair, pairs))
+
+
 
 def test_example():
     """
@@ -382,16 +799,25 @@ def main():
     """
     Main function to run the script from the command line.
     It checks for command-line arguments and processes the paper accordingly.
+    If more than one gene ID / PubMed ID pair is given, they are processed together and a list of results is returned.
     """
 
     if len(sys.argv) < 3:
         result = {"code": 1, "message": "Please provide a gene ID and a PubMed ID."}
         result = test_example()
 
-    else:
+    elif len(sys.argv) == 3:
         gene_id = sys.argv[1]
         pubmed_id = sys.argv[2]
         result = process_paper(gene_id, pubmed_id)
+
+    elif len(sys.argv) % 2 == 0:
+        result = {"code": 1, "message": "Please provide pairs of gene IDs and PubMed IDs."}
+
+    else:
+        # Several gene ID / PubMed ID pairs, processed as a batch.
+        args = sys.argv[1:]
+        result = process_papers(list(zip(args[0::2], args[1::2])))
     return result
 
 